@@ -1,12 +1,17 @@
 import argparse
+import csv
 import logging
+from functools import lru_cache
+from itertools import product
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
-import textdistance
+import pyarrow.parquet as pq
 from ..config import CDSCO_CLEAN, FDA_CLEAN, CDSCO_EXPLODED, PROC
-from ..utils.text import normalize, jaccard
-from rapidfuzz import fuzz
+from ..utils.text import normalize
+from rapidfuzz import fuzz, process
+from rapidfuzz.distance import JaroWinkler
 from ..utils.synonyms import load_synonyms
 
 # ----------------------------------------------------------------------------
@@ -15,18 +20,25 @@ JARO_THRESHOLD = 0.85       # Minimum Jaro-Winkler score for high similarity
 JACCARD_THRESHOLD = 0.1     # Minimum Jaccard similarity for candidate filtering
 TOKEN_THRESHOLD = 85        # Minimum RapidFuzz token-set ratio for fuzzy match
 RATIO_THRESHOLD = 85        # Minimum Levenshtein ratio for fuzzy match
+WORKERS = -1                # Threads for pair scoring (-1 uses all CPU cores)
+BLOCK_SIZE = 1024           # CDSCO rows scored per tile (bounds score-matrix memory)
+DENSE_FRACTION = 0.15       # Candidate share of a tile above which whole-tile scoring is faster
+
+# Columns of the cleaned datasets that matching actually reads
+MATCH_COLUMNS = ["Drug Name", "Date of Approval", "Indication", "RxCUI", "Original Drug Name", "Is Combination"]
 
 def is_high_confidence_match(jw, token, ratio, jw_thresh, token_thresh, ratio_thresh):
     """
     Determine if a candidate pair is a strong match by requiring at least two of three
     similarity metrics to meet or exceed their respective thresholds.
+    Scores may be scalars or NumPy arrays, in which case an element-wise mask is returned.
     """
-    criteria = [
-        jw >= jw_thresh,
-        token >= token_thresh,
-        ratio >= ratio_thresh,
-    ]
-    return sum(criteria) >= 2
+    jw_ok = jw >= jw_thresh
+    token_ok = token >= token_thresh
+    ratio_ok = ratio >= ratio_thresh
+    # Two-of-three majority with bitwise ops: no branches, no integer temporaries
+    # (adding NumPy booleans would be a logical OR, not a count)
+    return (jw_ok & token_ok) | ((jw_ok | token_ok) & ratio_ok)
 # ----------------------------------------------------------------------------
 
 # Setup logging
@@ -38,11 +50,277 @@ PROC.mkdir(exist_ok=True, parents=True)
 # Helper for robust fuzzy matching
 
 
+@lru_cache(maxsize=200_000)
+def _cached_jaro_winkler(s1, s2):
+    return JaroWinkler.normalized_similarity(s1, s2)
+
+
 def jaro(s1, s2):
     """Calculate Jaro-Winkler similarity between two strings."""
     if not isinstance(s1, str) or not isinstance(s2, str):
         return 0.0
-    return textdistance.jaro_winkler(s1, s2)
+    # Exact normalized matches are common; they need no scoring
+    if s1 == s2:
+        return 1.0
+    # Jaro-Winkler is symmetric, so both argument orders share one cache entry
+    if s1 > s2:
+        s1, s2 = s2, s1
+    return _cached_jaro_winkler(s1, s2)
+
+
+def _token_fingerprint(name):
+    """Sorted unique tokens of a name; token_set_ratio scores fingerprints exactly as the names."""
+    return " ".join(sorted(set(name.split())))
+
+
+def _token_frame(names):
+    """Long (row, token) frame holding each name's unique normalized tokens."""
+    tokens = pd.Series([sorted(set(normalize(x).split())) for x in names], dtype=object)
+    return tokens.explode().dropna().rename_axis("row").reset_index(name="token")
+
+
+def _jaccard_matrix(queries, choices, choice_tokens=None):
+    """Dense (query x choice) token Jaccard scores, equal to jaccard() for every pair.
+    Shared tokens are found by a hash join, so names with no token in common are
+    never compared and keep a score of 0. choice_tokens may pass in _token_frame(choices)
+    when the same choices are scored against several batches of queries."""
+    scores = np.zeros((len(queries), len(choices)), dtype=np.float64)
+    query_tokens = _token_frame(queries)
+    if choice_tokens is None:
+        choice_tokens = _token_frame(choices)
+    # Each joined row is one token shared by a (query, choice) pair
+    shared = query_tokens.merge(choice_tokens, on="token", suffixes=("_q", "_c"))
+    inter = shared.groupby(["row_q", "row_c"]).size()
+    rows = inter.index.get_level_values("row_q").to_numpy(dtype=np.intp)
+    cols = inter.index.get_level_values("row_c").to_numpy(dtype=np.intp)
+    inter = inter.to_numpy(dtype=np.float64)
+    query_len = np.bincount(query_tokens["row"].to_numpy(dtype=np.intp), minlength=len(queries))
+    choice_len = np.bincount(choice_tokens["row"].to_numpy(dtype=np.intp), minlength=len(choices))
+    # Same score as jaccard(): its union is padded by one
+    scores[rows, cols] = inter / (query_len[rows] + choice_len[cols] - inter + 1)
+    return scores
+
+
+def _read_match_columns(path):
+    """Memory-map a cleaned parquet file and load only the columns used for matching."""
+    available = set(pq.read_schema(path).names)
+    columns = [col for col in MATCH_COLUMNS if col in available]
+    return pd.read_parquet(path, columns=columns, memory_map=True)
+
+
+def _keep_best(best, record):
+    """Keep the highest Jaro-Winkler record per CDSCO name; the earliest record wins ties."""
+    prev = best.get(record["CDSCO Drug Name"])
+    if prev is None or record["Similarity Score"] > prev["Similarity Score"]:
+        best[record["CDSCO Drug Name"]] = record
+
+
+def _write_matches(best, out_file):
+    """Stream best-match records to CSV, highest Jaro-Winkler first.
+    Records without a Match Type are fuzzy matches; missing values are left blank."""
+    records = sorted(best.values(), key=lambda r: r["Similarity Score"], reverse=True)
+    fieldnames = list(dict.fromkeys(
+        ["CDSCO Drug Name", "FDA Drug Name", "Similarity Score"] + [key for r in records for key in r]
+    ))
+    if "Match Type" not in fieldnames:
+        fieldnames.append("Match Type")
+    with open(out_file, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.DictWriter(fh, fieldnames=fieldnames, lineterminator="\n")
+        writer.writeheader()
+        for record in records:
+            row = {key: "" if pd.isna(value) else value for key, value in record.items()}
+            row.setdefault("Match Type", "Fuzzy")
+            writer.writerow(row)
+    return len(records)
+
+
+def _column(df, col, default=""):
+    """Return a column as a NumPy array, or a constant array if the column is absent."""
+    if col in df.columns:
+        return df[col].to_numpy()
+    values = np.empty(len(df), dtype=object)
+    values[:] = [default] * len(df)
+    return values
+
+
+def _load_match_inputs(use_exploded):
+    """Load the cleaned datasets, take out RxNorm ID matches and prepare the fuzzy names.
+
+    Returns (c, f, best, query_ids, c_query, f_norm), or None if the CDSCO file is
+    missing: the remaining CDSCO and FDA rows, the RxNorm best-match records keyed by
+    CDSCO name, each CDSCO row's query id, the distinct query names and the FDA names."""
+    logging.info("Loading cleaned datasets")
+    # Choose CDSCO dataset based on use_exploded flag
+    cdsco_path = CDSCO_EXPLODED if use_exploded else CDSCO_CLEAN
+    logging.info(f"Using CDSCO dataset: {cdsco_path}")
+    
+    if not cdsco_path.exists():
+        if use_exploded:
+            logging.error(f"Exploded CDSCO file not found. Run clean.py with --explode-combinations first.")
+            return None
+        else:
+            logging.error(f"CDSCO clean file not found. Run clean.py first.")
+            return None
+            
+    c = _read_match_columns(cdsco_path)
+    f = _read_match_columns(FDA_CLEAN)
+    # Best match record per CDSCO name, updated as matches are found
+    best = {}
+    
+    # Check for RxCUI-based authoritative matches
+    if 'RxCUI' in c.columns and 'RxCUI' in f.columns:
+        logging.info("Performing RxNorm ID-based matching")
+        id_c = c[c['RxCUI'].notna()]
+        id_f = f[f['RxCUI'].notna()]
+        id_pairs = id_c.merge(id_f, on='RxCUI', suffixes=('_cdsco','_fda'))
+        for c_name, f_name, c_date, f_date, c_ind, f_ind in zip(
+            _column(id_pairs, 'Drug Name_cdsco'),
+            _column(id_pairs, 'Drug Name_fda'),
+            _column(id_pairs, 'Date of Approval_cdsco'),
+            _column(id_pairs, 'Date of Approval_fda'),
+            _column(id_pairs, 'Indication_cdsco'),
+            _column(id_pairs, 'Indication_fda'),
+        ):
+            _keep_best(best, {
+                'CDSCO Drug Name': c_name,
+                'FDA Drug Name': f_name,
+                'Similarity Score': 1.0,
+                'Match Type': 'RxNorm',
+                'CDSCO Approval Date': c_date,
+                'FDA Approval Date': f_date,
+                'CDSCO Indication': c_ind,
+                'FDA Indication': f_ind,
+            })
+        # Remove ID-matched entries from fuzzy matching pool
+        matched_ids = set(id_pairs['RxCUI'])
+        c = c[~c['RxCUI'].isin(matched_ids)]
+        logging.info(f"Removed {len(matched_ids)} ID-matched CDSCO entries for fuzzy step")
+    
+    # Normalize drug names
+    logging.info("Normalizing drug names")
+    c["drug_norm"] = list(map(normalize, c["Drug Name"].tolist()))
+    f["drug_norm"] = list(map(normalize, f["Drug Name"].tolist()))
+
+    # Remove entries with empty normalized names
+    initial_c, initial_f = len(c), len(f)
+    c = c[c["drug_norm"] != ""]
+    f = f[f["drug_norm"] != ""]
+    logging.info(
+        f"Dropped {initial_c - len(c)} CDSCO and {initial_f - len(f)} FDA entries with empty names"
+    )
+
+    # Drop duplicate normalized names
+    c = c.drop_duplicates(subset=["drug_norm"])
+    f = f.drop_duplicates(subset=["drug_norm"])
+    logging.info(f"Unique normalized names: CDSCO={len(c)}, FDA={len(f)}")
+
+    # Load synonyms mapping
+    logging.info("Loading synonyms mapping (if any)")
+    synonyms = load_synonyms()
+
+    # Apply synonyms mapping to the CDSCO query names in one pass
+    c["drug_norm"] = c["drug_norm"].map(synonyms).fillna(c["drug_norm"])
+    # Synonyms can map several names onto one query, so score each distinct query once
+    query_ids, c_query = pd.factorize(c["drug_norm"])
+    return c, f, best, query_ids, c_query.tolist(), f["drug_norm"].tolist()
+
+
+def _score_candidates(c_query, f_norm, jaccard_threshold, threshold, ratio_threshold, workers):
+    """Score every (query, FDA name) pair that passes the Jaccard pre-filter.
+
+    Returns a dict of flat arrays in (query, FDA name) order: "row" (query id), "col"
+    (FDA index) and the "jaccard", "jw", "token" and "ratio" scores. Token-set ratios are
+    only computed for pairs reaching threshold on Jaro-Winkler or ratio_threshold on
+    Levenshtein ratio (the rest are 0); no other pair can pass two of three checks at
+    these or stricter thresholds."""
+    # Hold names and token fingerprints as contiguous object arrays so candidate pairs
+    # are gathered by fancy indexing rather than element by element in Python
+    c_names = np.asarray(c_query, dtype=object)
+    f_names = np.asarray(f_norm, dtype=object)
+    # Tokenize each name once up front rather than inside every token_set_ratio call
+    c_fingerprint = np.asarray([_token_fingerprint(name) for name in c_query], dtype=object)
+    f_fingerprint = np.asarray([_token_fingerprint(name) for name in f_norm], dtype=object)
+    f_tokens = _token_frame(f_norm)
+    # Fuzzy matching with Jaccard pre-filtering, one tile of queries at a time
+    # so the intermediate arrays stay cache-sized and are freed before the next tile
+    tiles = []
+    for start in range(0, len(c_names), BLOCK_SIZE):
+        block = c_names[start:start + BLOCK_SIZE]
+        jaccard_scores = _jaccard_matrix(block, f_names, f_tokens)
+        rows, cols = np.nonzero(jaccard_scores >= jaccard_threshold)
+        if len(rows) > DENSE_FRACTION * jaccard_scores.size:
+            # Most pairs are candidates: RapidFuzz's SIMD batch kernels score the whole
+            # tile faster than pair by pair, then the candidates are picked out
+            jw_scores = process.cdist(block, f_names, scorer=JaroWinkler.normalized_similarity, dtype=np.float64, workers=workers)[rows, cols]
+            ratio_scores = process.cdist(block, f_names, scorer=fuzz.ratio, dtype=np.float64, workers=workers)[rows, cols]
+        else:
+            queries = block[rows]
+            choices = f_names[cols]
+            # Score candidate pairs element-wise (float64 keeps threshold edges exact)
+            jw_scores = process.cpdist(queries, choices, scorer=JaroWinkler.normalized_similarity, dtype=np.float64, workers=workers)
+            # Levenshtein ratio fallback
+            ratio_scores = process.cpdist(queries, choices, scorer=fuzz.ratio, dtype=np.float64, workers=workers)
+        # Token-set ratio is the costliest metric; a pair failing both Jaro-Winkler
+        # and ratio can never reach two of three, so only score the rest
+        needs_token = np.flatnonzero((jw_scores >= threshold) | (ratio_scores >= ratio_threshold))
+        token_scores = np.zeros(len(rows), dtype=np.float64)
+        token_scores[needs_token] = process.cpdist(
+            c_fingerprint[start + rows[needs_token]],
+            f_fingerprint[cols[needs_token]],
+            scorer=fuzz.token_set_ratio,
+            dtype=np.float64,
+            workers=workers,
+        )
+        tiles.append((start + rows, cols, jaccard_scores[rows, cols], jw_scores, token_scores, ratio_scores))
+    keys = ["row", "col", "jaccard", "jw", "token", "ratio"]
+    if not tiles:
+        return {key: np.zeros(0, dtype=np.intp if key in ("row", "col") else np.float64) for key in keys}
+    return {key: np.concatenate(arrays) for key, arrays in zip(keys, zip(*tiles))}
+
+
+def _collect_matches(best, scores, mask, query_ids, c, f, use_exploded):
+    """Add a record to best for every scored pair selected by mask, keeping the best per CDSCO name."""
+    hits = {}  # query id -> [(FDA index, jw, token, ratio), ...]
+    for k in np.flatnonzero(mask):
+        hits.setdefault(scores["row"][k], []).append(
+            (scores["col"][k], float(scores["jw"][k]), float(scores["token"][k]), float(scores["ratio"][k]))
+        )
+    # Pull output columns out once as arrays so the match loop avoids per-row Series
+    c_name, f_name = _column(c, "Drug Name"), _column(f, "Drug Name")
+    c_date, f_date = _column(c, "Date of Approval"), _column(f, "Date of Approval")
+    c_ind, f_ind = _column(c, "Indication"), _column(f, "Indication")
+    if use_exploded:
+        c_orig = c["Original Drug Name"].to_numpy() if "Original Drug Name" in c.columns else c_name
+        c_combo = _column(c, "Is Combination", False)
+
+    # Fan each query's matches back out to its CDSCO rows, in row order
+    for i, q in enumerate(query_ids):
+        for j, jw_score, token_score, ratio_score in hits.get(q, ()):
+            match_data = {
+                "CDSCO Drug Name": c_name[i],
+                "FDA Drug Name": f_name[j],
+                "Similarity Score": jw_score,  # Jaro-Winkler
+                "Token Score": token_score,    # RapidFuzz token-set ratio
+                "Ratio Score": ratio_score,    # Levenshtein ratio
+                "CDSCO Approval Date": c_date[i],
+                "FDA Approval Date": f_date[j],
+                "CDSCO Indication": c_ind[i],
+                "FDA Indication": f_ind[j],
+            }
+
+            # Add combination drug info if available
+            if use_exploded:
+                match_data["Original CDSCO Drug"] = c_orig[i]
+                match_data["Is Combination"] = c_combo[i]
+
+            _keep_best(best, match_data)
+
+
+def _match_mask(scores, threshold, jaccard_threshold, token_threshold, ratio_threshold):
+    """Pairs that pass the Jaccard pre-filter and the two-of-three consensus check."""
+    return (scores["jaccard"] >= jaccard_threshold) & is_high_confidence_match(
+        scores["jw"], scores["token"], scores["ratio"], threshold, token_threshold, ratio_threshold
+    )
 
 
 def run(
@@ -52,6 +330,7 @@ def run(
     ratio_threshold: int = RATIO_THRESHOLD,
     out_file: Path | str | None = None,
     use_exploded: bool = False,
+    workers: int = WORKERS,
 ):
     """Identify overlapping drugs between CDSCO and FDA datasets using fuzzy matching.
     threshold: Jaro-Winkler similarity threshold.
@@ -59,7 +338,9 @@ def run(
     token_threshold: Token-set ratio threshold for fuzzy matching.
     ratio_threshold: Levenshtein ratio threshold for fuzzy matching.
     out_file: output CSV file path.
-    use_exploded: If True, use the exploded CDSCO dataset with individual APIs."""
+    use_exploded: If True, use the exploded CDSCO dataset with individual APIs.
+    workers: number of threads used for pair scoring (-1 for all cores).
+    Returns the written best-match records keyed by CDSCO name, or None on failure."""
     # Determine output path
     if out_file is None:
         out_file = PROC / "overlap.csv"
@@ -67,125 +348,54 @@ def run(
     out_file.parent.mkdir(parents=True, exist_ok=True)
 
     try:
-        logging.info("Loading cleaned datasets")
-        # Choose CDSCO dataset based on use_exploded flag
-        cdsco_path = CDSCO_EXPLODED if use_exploded else CDSCO_CLEAN
-        logging.info(f"Using CDSCO dataset: {cdsco_path}")
-        
-        if not cdsco_path.exists():
-            if use_exploded:
-                logging.error(f"Exploded CDSCO file not found. Run clean.py with --explode-combinations first.")
-                return
-            else:
-                logging.error(f"CDSCO clean file not found. Run clean.py first.")
-                return
-                
-        c = pd.read_parquet(cdsco_path)
-        f = pd.read_parquet(FDA_CLEAN)
-        # Initialize match container
-        matches = []
-        
-        # Check for RxCUI-based authoritative matches
-        if 'RxCUI' in c.columns and 'RxCUI' in f.columns:
-            logging.info("Performing RxNorm ID-based matching")
-            id_c = c[c['RxCUI'].notna()]
-            id_f = f[f['RxCUI'].notna()]
-            id_pairs = id_c.merge(id_f, on='RxCUI', suffixes=('_cdsco','_fda'))
-            for _, ip in id_pairs.iterrows():
-                matches.append({
-                    'CDSCO Drug Name': ip['Drug Name_cdsco'],
-                    'FDA Drug Name': ip['Drug Name_fda'],
-                    'Similarity Score': 1.0,
-                    'Match Type': 'RxNorm',
-                    'CDSCO Approval Date': ip.get('Date of Approval_cdsco',''),
-                    'FDA Approval Date': ip.get('Date of Approval_fda',''),
-                    'CDSCO Indication': ip.get('Indication_cdsco',''),
-                    'FDA Indication': ip.get('Indication_fda',''),
-                })
-            # Remove ID-matched entries from fuzzy matching pool
-            matched_ids = set(id_pairs['RxCUI'])
-            c = c[~c['RxCUI'].isin(matched_ids)]
-            logging.info(f"Removed {len(matched_ids)} ID-matched CDSCO entries for fuzzy step")
-        
-        # Normalize drug names
-        logging.info("Normalizing drug names")
-        c["drug_norm"] = c["Drug Name"].apply(normalize)
-        f["drug_norm"] = f["Drug Name"].apply(normalize)
-
-        # Remove entries with empty normalized names
-        initial_c, initial_f = len(c), len(f)
-        c = c[c["drug_norm"] != ""]
-        f = f[f["drug_norm"] != ""]
-        logging.info(
-            f"Dropped {initial_c - len(c)} CDSCO and {initial_f - len(f)} FDA entries with empty names"
-        )
-
-        # Drop duplicate normalized names
-        c = c.drop_duplicates(subset=["drug_norm"])
-        f = f.drop_duplicates(subset=["drug_norm"])
-        logging.info(f"Unique normalized names: CDSCO={len(c)}, FDA={len(f)}")
+        inputs = _load_match_inputs(use_exploded)
+        if inputs is None:
+            return
+        c, f, best, query_ids, c_query, f_norm = inputs
 
-        # Load synonyms mapping
-        logging.info("Loading synonyms mapping (if any)")
-        synonyms = load_synonyms()
-
-        # Fuzzy matching with Jaccard pre-filtering
         logging.info("Starting fuzzy matching")
-        for _, row in c.iterrows():
-            # Get normalized name and apply synonyms mapping
-            name = row["drug_norm"]
-            name = synonyms.get(name, name)
-            # Pre-filter candidates by Jaccard similarity
-            candidates = f[
-                f["drug_norm"].apply(lambda x: jaccard(name, x) >= jaccard_threshold)
-            ]
-            for _, fda_row in candidates.iterrows():
-                # Compute similarity scores
-                jw_score = jaro(name, fda_row["drug_norm"])
-                token_score = fuzz.token_set_ratio(name, fda_row["drug_norm"])
-                # Levenshtein ratio fallback
-                ratio_score = fuzz.ratio(name, fda_row["drug_norm"])
-                # Use consensus check for high-confidence matching
-                if is_high_confidence_match(jw_score, token_score, ratio_score, threshold, token_threshold, ratio_threshold):
-                    match_data = {
-                        "CDSCO Drug Name": row["Drug Name"],
-                        "FDA Drug Name": fda_row["Drug Name"],
-                        "Similarity Score": jw_score,  # Jaro-Winkler
-                        "Token Score": token_score,    # RapidFuzz token-set ratio
-                        "Ratio Score": ratio_score,    # Levenshtein ratio
-                        "CDSCO Approval Date": row.get("Date of Approval", ""),
-                        "FDA Approval Date": fda_row.get("Date of Approval", ""),
-                        "CDSCO Indication": row.get("Indication", ""),
-                        "FDA Indication": fda_row.get("Indication", ""),
-                    }
-                    
-                    # Add combination drug info if available
-                    if use_exploded:
-                        match_data["Original CDSCO Drug"] = row.get("Original Drug Name", row["Drug Name"])
-                        match_data["Is Combination"] = row.get("Is Combination", False)
-                    
-                    matches.append(match_data)
-
-        # Compile raw match results and emit only actual matches
-        raw_df = pd.DataFrame(matches).drop_duplicates().reset_index(drop=True)
-        # Ensure match type exists
-        if 'Match Type' not in raw_df.columns:
-            raw_df['Match Type'] = 'Fuzzy'
-        else:
-            raw_df['Match Type'] = raw_df['Match Type'].fillna('Fuzzy')
-        # Select best match per CDSCO entry
-        best_df = raw_df.sort_values(by='Similarity Score', ascending=False)
-        best_df = best_df.drop_duplicates(subset=['CDSCO Drug Name'], keep='first').reset_index(drop=True)
-        # Save only matched pairs
-        best_df.to_csv(out_file, index=False)
+        scores = _score_candidates(c_query, f_norm, jaccard_threshold, threshold, ratio_threshold, workers)
+        # Use consensus check for high-confidence matching
+        mask = _match_mask(scores, threshold, jaccard_threshold, token_threshold, ratio_threshold)
+        _collect_matches(best, scores, mask, query_ids, c, f, use_exploded)
+
+        # Save only the best matched pair per CDSCO entry
+        n_matches = _write_matches(best, out_file)
         logging.info(f"Overlap results with only matched pairs written to {out_file}")
-        logging.info(f"Found matches for {best_df['CDSCO Drug Name'].nunique()} CDSCO entries")
-        logging.info(f"Total match records: {len(best_df)}")
+        logging.info(f"Found matches for {len(best)} CDSCO entries")
+        logging.info(f"Total match records: {n_matches}")
+        return best
     except Exception as e:
         logging.error(f"Error loading cleaned data: {e}")
         return
 
 
+def sweep(
+    thresholds,
+    jaccard_thresholds,
+    token_threshold: int = TOKEN_THRESHOLD,
+    ratio_threshold: int = RATIO_THRESHOLD,
+    use_exploded: bool = False,
+    workers: int = WORKERS,
+):
+    """Yield (threshold, jaccard_threshold, best) for every pair of the given Jaro-Winkler
+    and Jaccard thresholds, where best holds the records run() would write for them.
+    Candidate pairs are scored once, at the loosest thresholds, and each threshold
+    pair only re-applies the checks to those scores."""
+    inputs = _load_match_inputs(use_exploded)
+    if inputs is None:
+        return
+    c, f, rxnorm_best, query_ids, c_query, f_norm = inputs
+    scores = _score_candidates(
+        c_query, f_norm, min(jaccard_thresholds), min(thresholds), ratio_threshold, workers
+    )
+    for threshold, jaccard_threshold in product(thresholds, jaccard_thresholds):
+        best = dict(rxnorm_best)
+        mask = _match_mask(scores, threshold, jaccard_threshold, token_threshold, ratio_threshold)
+        _collect_matches(best, scores, mask, query_ids, c, f, use_exploded)
+        yield threshold, jaccard_threshold, best
+
+
 def main():
     """Parse command-line arguments and execute the drug matching process."""
     parser = argparse.ArgumentParser(
@@ -226,6 +436,12 @@ def main():
         action="store_true",
         help="Use the exploded CDSCO dataset with individual APIs",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=WORKERS,
+        help="Number of threads for pair scoring (-1 uses all CPU cores)",
+    )
     args = parser.parse_args()
     run(
         threshold=args.threshold,
@@ -234,6 +450,7 @@ def main():
         ratio_threshold=args.ratio_threshold,
         out_file=args.out_file,
         use_exploded=args.use_exploded,
+        workers=args.workers,
     )
 
 
@@ -15,4 +15,4 @@ FDA_CLEAN = PROC / "fda_clean.parquet"
 
 # Added for combination drug support
 CDSCO_EXPLODED = PROC / "cdsco_exploded.parquet"
-FDA_VOCAB_PATH = PROC / "fda_api_vocab.pkl"
+FDA_VOCAB_PATH = PROC / "fda_api_vocab.arrow"
@@ -7,6 +7,7 @@ Full cleaning pipeline:
 """
 
 from __future__ import annotations
+import numpy as np
 import pandas as pd, re, unicodedata
 import argparse
 from .load import load_raw
@@ -17,7 +18,17 @@ from ..utils.api_splitter import split_apis
 
 PROC.mkdir(exist_ok=True, parents=True)
 
-DATE_PAT = re.compile(r"(\d{1,2})[/-](\d{1,2})[/-](\d{2,4})")
+# "." separates date parts too, e.g. 1.2.99
+DATE_PAT = re.compile(r"(\d{1,2})[/.-](\d{1,2})[/.-](\d{2,4})")
+YEAR_PAT = re.compile(r"\d{4}")  # year only
+MONTH_YEAR_PAT = re.compile(r"\d{2}/\d{4}")  # mm/yyyy
+WS_PAT = re.compile(r"\s+")
+# Dosage form / unit word; it and everything after it is stripped from drug names
+_FORM_WORD = r"\b(?:tablet|capsule|injection|cream|ointment|spray|solution|gel|drops?|suspension|eye|ear|nasal|intranasal|oral|iv|im|vial|ampoule|sachet|mg|mcg|g|%|w\/v|w\/w|v\/v)\b"
+# Forms and strengths (e.g. "500mg") in one pass. Same cut as stripping forms first and
+# strengths second: a strength whose unit is itself a form word is left alone
+# ("0.1%w/w" keeps "0.1"), hence the lookahead
+FORMS_PAT = re.compile(rf"{_FORM_WORD}.*|[\d.,]+(?!{_FORM_WORD})(?:mg|mcg|g|%)+.*", re.I)
 
 
 def _norm_date(s: str) -> str | pd.NaT:
@@ -25,12 +36,12 @@ def _norm_date(s: str) -> str | pd.NaT:
     if pd.isna(s) or not str(s).strip():
         return pd.NaT
     s = str(s).strip()
-    if re.match(r"^\d{4}$", s):  # year only
+    if YEAR_PAT.fullmatch(s):  # year only
         return f"01/01/{s}"
-    if re.match(r"^\d{2}/\d{4}$", s):  # mm/yyyy
+    if MONTH_YEAR_PAT.fullmatch(s):  # mm/yyyy
         m, y = s.split("/")
         return f"{m.zfill(2)}/01/{y}"
-    m = DATE_PAT.search(s.replace(".", "/").replace("-", "/"))
+    m = DATE_PAT.search(s)
     if m:
         d, mth, yr = m.groups()
         yr = yr.zfill(4) if len(yr) == 4 else f"19{yr}" if int(yr) > 30 else f"20{yr}"
@@ -38,29 +49,62 @@ def _norm_date(s: str) -> str | pd.NaT:
     return pd.NaT
 
 
+def _norm_dates(dates: pd.Series) -> pd.Series:
+    """Vectorized _norm_date: apply the same date rules to a whole Series at once."""
+    out = pd.Series(pd.NaT, index=dates.index, dtype=object)
+    s = dates[dates.notna()].astype(str).str.strip()
+    s = s[s != ""]
+    year_only = s.str.fullmatch(YEAR_PAT)
+    out[year_only[year_only].index] = "01/01/" + s[year_only]
+    month_year = s.str.fullmatch(MONTH_YEAR_PAT) & ~year_only
+    out[month_year[month_year].index] = s[month_year].str[:2] + "/01/" + s[month_year].str[3:]
+    rest = s[~year_only & ~month_year]
+    parts = rest.str.extract(DATE_PAT)
+    parts = parts[parts[0].notna()]
+    d, mth, yr = parts[0], parts[1], parts[2]
+    century = pd.Series(np.where(yr.astype(int) > 30, "19", "20"), index=yr.index)
+    yr = yr.where(yr.str.len() == 4, century + yr)
+    out[parts.index] = mth.str.zfill(2) + "/" + d.str.zfill(2) + "/" + yr
+    return out
+
+
 def _norm_text(x: str) -> str:
     """Normalize text by removing extra spaces and accents."""
     if pd.isna(x):
         return ""
     x = unicodedata.normalize("NFKD", x)
-    x = re.sub(r"\s+", " ", x).strip()
+    x = WS_PAT.sub(" ", x).strip()
     return x
 
 
+def _norm_texts(texts: pd.Series) -> pd.Series:
+    """Vectorized _norm_text over a Series."""
+    return (
+        texts.fillna("")
+        .str.normalize("NFKD")
+        .str.replace(WS_PAT, " ", regex=True)
+        .str.strip()
+    )
+
+
 def _strip_forms(drug: str) -> str:
     """Remove dosage forms and strengths from drug names."""
     drug = _norm_text(drug)
-    drug = re.sub(
-        r"\b(tablet|capsule|injection|cream|ointment|spray|solution|gel|drops?|suspension|eye|ear|nasal|intranasal|oral|iv|im|vial|ampoule|sachet|mg|mcg|g|%|w\/v|w\/w|v\/v)\b.*",
-        "",
-        drug,
-        flags=re.I,
-    )
-    drug = re.sub(r"[\d.,]+(mg|mcg|g|%)+.*", "", drug, flags=re.I)
+    drug = FORMS_PAT.sub("", drug)
     drug = drug.strip(",;- ").title()
     return drug
 
 
+def _strip_all_forms(drugs: pd.Series) -> pd.Series:
+    """Vectorized _strip_forms over a Series."""
+    return (
+        _norm_texts(drugs)
+        .str.replace(FORMS_PAT, "", regex=True)
+        .str.strip(",;- ")
+        .str.title()
+    )
+
+
 def _explode_combination_drugs(df: pd.DataFrame) -> pd.DataFrame:
     """
     Explode combination drugs into individual API components.
@@ -83,30 +127,23 @@ def _explode_combination_drugs(df: pd.DataFrame) -> pd.DataFrame:
     
     # Apply API splitting to each drug name
     print("Splitting combination drugs into individual APIs...")
-    exploded_rows = []
-    
-    for _, row in df.iterrows():
-        drug_name = row["Drug Name"]
-        apis = split_apis(drug_name, vocab)
-        
-        if not apis:
-            # If no APIs found, keep the original drug name as a single API
-            exploded_rows.append(row)
-        else:
-            # Create a new row for each API
-            for api in apis:
-                new_row = row.copy()
-                new_row["Drug Name"] = api
-                new_row["Original Drug Name"] = drug_name  # Store the original combination
-                new_row["Is Combination"] = len(apis) > 1  # Flag if this was part of a combination
-                exploded_rows.append(new_row)
-    
-    exploded_df = pd.DataFrame(exploded_rows)
+    apis = [split_apis(drug_name, vocab) for drug_name in df["Drug Name"]]
+    found = [bool(parts) for parts in apis]
+
+    # Rows without recognised APIs are kept as-is, without combination metadata
+    exploded_df = df.copy()
+    exploded_df["Original Drug Name"] = df["Drug Name"].where(found)  # Store the original combination
+    exploded_df["Is Combination"] = pd.Series(
+        [len(parts) > 1 if parts else None for parts in apis], index=df.index, dtype=object
+    )  # Flag if this was part of a combination
+    exploded_df["Drug Name"] = [parts or [drug_name] for parts, drug_name in zip(apis, df["Drug Name"])]
+    # One row per API component, preserving metadata
+    exploded_df = exploded_df.explode("Drug Name")
     
     # Add normalized drug names again after splitting
     if "drug_norm" in exploded_df.columns:
         from ..utils.text import normalize
-        exploded_df["drug_norm"] = exploded_df["Drug Name"].apply(normalize)
+        exploded_df["drug_norm"] = list(map(normalize, exploded_df["Drug Name"].tolist()))
     
     return exploded_df
 
@@ -133,9 +170,9 @@ def clean(explode_combinations: bool = False):
             "Strength": "Strength",
         }
     )
-    cdsco["Date of Approval"] = cdsco["Date of Approval"].apply(_norm_date)
-    cdsco["Drug Name"] = cdsco["Drug Name"].apply(_strip_forms)
-    cdsco["Indication"] = cdsco["Indication"].apply(_norm_text)
+    cdsco["Date of Approval"] = _norm_dates(cdsco["Date of Approval"])
+    cdsco["Drug Name"] = _strip_all_forms(cdsco["Drug Name"])
+    cdsco["Indication"] = _norm_texts(cdsco["Indication"])
 
     # Log missing fields and impute if necessary for CDSCO
     cdsco = impute(cdsco, "CDSCO")
@@ -151,9 +188,9 @@ def clean(explode_combinations: bool = False):
             "Sponsor Country": "Country",
         }
     )
-    fda["Date of Approval"] = fda["Date of Approval"].apply(_norm_date)
-    fda["Drug Name"] = fda["Drug Name"].apply(_strip_forms)
-    fda["Indication"] = fda["Indication"].apply(_norm_text)
+    fda["Date of Approval"] = _norm_dates(fda["Date of Approval"])
+    fda["Drug Name"] = _strip_all_forms(fda["Drug Name"])
+    fda["Indication"] = _norm_texts(fda["Indication"])
     if "Orphan" in fda:
         fda["Orphan"] = (
             fda["Orphan"]
@@ -172,11 +209,16 @@ def clean(explode_combinations: bool = False):
 
     # Enrich with RxNorm IDs where possible
     try:
-        from ..utils.rxnorm import name_to_rxcui
+        from ..utils.rxnorm import names_to_rxcuis, flush_rxcui_cache
         from ..utils.text import normalize as txt_normalize
         print("🔍 Enriching with RxNorm IDs...")
-        cdsco["RxCUI"] = cdsco["Drug Name"].apply(lambda x: name_to_rxcui(txt_normalize(x)))
-        fda["RxCUI"] = fda["Drug Name"].apply(lambda x: name_to_rxcui(txt_normalize(x)))
+        cdsco_norm = cdsco["Drug Name"].map(txt_normalize)
+        fda_norm = fda["Drug Name"].map(txt_normalize)
+        # Resolve each unique normalized name once, then map back onto both datasets
+        rxcui = names_to_rxcuis(pd.unique(pd.concat([cdsco_norm, fda_norm])))
+        cdsco["RxCUI"] = cdsco_norm.map(rxcui)
+        fda["RxCUI"] = fda_norm.map(rxcui)
+        flush_rxcui_cache()
     except ImportError:
         print("⚠️ RxNorm enrichment not available; continuing without RxCUI.")
 
@@ -4,8 +4,10 @@ Utilities for splitting combination drug names into individual API components.
 
 import re
 import logging
-import textdistance
-from typing import List, Set, Tuple
+import numpy as np
+from rapidfuzz import process
+from rapidfuzz.distance import JaroWinkler
+from typing import Dict, List, Set, Tuple
 from .text import normalize
 
 # Configure logging
@@ -15,6 +17,22 @@ logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s: %(mes
 VOCAB_MATCH_THRESHOLD = 0.9  # Threshold for considering a split valid when matching against vocabulary
 FINAL_FILTER_THRESHOLD = 0.8  # Threshold for filtering out fragments that don't match any vocabulary term
 
+# Characters that mark a possible combination (or parenthetical) in a drug name
+COMBINATION_CHARS = frozenset("(,/+&")
+
+# Precompiled patterns for splitting drug names
+# One-pass split on delimiter characters, " and " and " with ", keeping their old
+# sequential-substitution priority: a word never takes whitespace that belongs to a
+# delimiter, and " with " yields to a following " and ". A bare "|" was the placeholder
+# used for the split, so it still splits too.
+SPLIT_PAT = re.compile(
+    r'\s*[,/+&]\s*'
+    r'|\s+and\s+(?![\s,/+&])'
+    r'|\s+with\s+(?![\s,/+&]|and\s+(?![\s,/+&]))'
+    r'|\|'
+)
+AND_ANY_CASE_PAT = re.compile(r'\s+and\s+', re.IGNORECASE)
+
 # Special case mappings for known combinations that have alternative canonical names
 SPECIAL_COMBINATIONS = {
     "folinic acid and calcium": "calcium folinate",
@@ -26,6 +44,20 @@ SPECIAL_COMBINATIONS = {
     "calcium folinate": "calcium folinate",  # Include the canonical form itself
 }
 
+# All special combinations as one word-bounded alternation, longest first so a key is
+# never shadowed by a shorter key it starts with
+SPECIAL_PAT = re.compile(
+    r'\b(?:' + '|'.join(re.escape(pattern) for pattern in sorted(SPECIAL_COMBINATIONS, key=len, reverse=True))
+    + r')\b', re.IGNORECASE
+)
+
+# Memoized split_apis results, keyed by (drug name, id(vocab)). Each entry holds a reference
+# to its vocabulary so the id cannot be reused by another set while the entry is alive.
+_SPLIT_CACHE: Dict[Tuple[str, int], Tuple[Set[str], Tuple[str, ...]]] = {}
+
+# Most words in any vocabulary term, keyed (and kept alive) the same way
+_MAX_TERM_WORDS: Dict[int, Tuple[Set[str], int]] = {}
+
 
 def _extract_parentheticals(text: str) -> Tuple[str, List[str]]:
     """
@@ -43,29 +75,30 @@ def _extract_parentheticals(text: str) -> Tuple[str, List[str]]:
         return "", []
     
     result = []
-    stack = []
+    backbone = []  # Slices of text outside top-level parentheses
+    depth = 0
     start_idx = -1
-    backbone = list(text)
+    last = 0  # Start of the backbone slice not yet copied
     
     for i, char in enumerate(text):
         if char == '(':
-            if not stack:  # Start of a top-level parenthesis
+            if depth == 0:  # Start of a top-level parenthesis
                 start_idx = i
-            stack.append(i)
-        elif char == ')' and stack:
-            stack.pop()
-            if not stack:  # End of a top-level parenthesis
+            depth += 1
+        elif char == ')' and depth:
+            depth -= 1
+            if depth == 0:  # End of a top-level parenthesis
                 # Extract the content without the parentheses
                 content = text[start_idx + 1:i].strip()
                 if content:
                     result.append(content)
-                # Mark for removal in the backbone
-                for j in range(start_idx, i + 1):
-                    backbone[j] = ' '
+                # Keep the backbone up to the parenthesis and skip past it
+                backbone.append(text[last:start_idx])
+                last = i + 1
+    backbone.append(text[last:])  # An unclosed parenthesis stays in the backbone
     
-    # Rebuild the backbone string without parenthetical content
-    backbone_text = ''.join(backbone).strip()
-    backbone_text = re.sub(r'\s+', ' ', backbone_text)
+    # Removed spans separate words, then whitespace is collapsed
+    backbone_text = ' '.join(' '.join(backbone).split())
     
     return backbone_text, result
 
@@ -83,29 +116,56 @@ def _split_by_delimiters(text: str) -> List[str]:
     if not text:
         return []
     
-    # Replace common delimiters with a standard delimiter
-    standardized = text
-    standardized = re.sub(r'\s*[,/+&]\s*', '|', standardized)
-    standardized = re.sub(r'\s+and\s+', '|', standardized)
-    standardized = re.sub(r'\s+with\s+', '|', standardized)  # Add "with" as a delimiter
-    
-    # Split on the standard delimiter
-    parts = [part.strip() for part in standardized.split('|')]
+    # Split on all delimiters in a single scan
+    parts = [part.strip() for part in SPLIT_PAT.split(text)]
     return [part for part in parts if part]
 
 
-def _best_vocab_match(term: str, vocab: Set[str]) -> Tuple[str, float]:
+def _embedded_vocab_terms(norm_text: str, vocab: Set[str]) -> List[str]:
+    """
+    Find vocabulary terms (longer than 4 characters) embedded as whole words in text.
+    
+    Both the text and the vocabulary are normalized, so a word-bounded match of a term
+    is exactly a run of consecutive words equal to it; every run no longer than the longest
+    term is looked up in the set.
+    
+    Args:
+        norm_text: Normalized text to search
+        vocab: Set of normalized vocabulary terms
+        
+    Returns:
+        Title-cased terms found, in order of first appearance, without duplicates
+    """
+    entry = _MAX_TERM_WORDS.get(id(vocab))
+    if entry is None:
+        entry = (vocab, max((len(term.split()) for term in vocab), default=0))
+        _MAX_TERM_WORDS[id(vocab)] = entry
+    max_words = entry[1]
+    
+    words = norm_text.split()
+    found = {}  # Insertion-ordered, so duplicates keep their first position
+    for start in range(len(words)):
+        # No run longer than the longest vocabulary term can match
+        for end in range(start + 1, min(start + max_words, len(words)) + 1):
+            phrase = " ".join(words[start:end])
+            if len(phrase) > 4 and phrase in vocab:
+                found[phrase.title()] = None
+    return list(found)
+
+
+def _best_vocab_match(term: str, vocab: Set[str], score_cutoff: float = 0.0) -> Tuple[str, float]:
     """
     Find the best matching vocabulary term for a given string.
     
     Args:
         term: Term to match
         vocab: Set of vocabulary terms to match against
+        score_cutoff: Scores below this count as no match, letting the scorer exit early
         
     Returns:
         Tuple containing:
-            - Best matching vocabulary term
-            - Jaro-Winkler similarity score
+            - Best matching vocabulary term ("" if none reaches the cutoff)
+            - Jaro-Winkler similarity score (0.0 if none reaches the cutoff)
     """
     if not term or not vocab:
         return "", 0.0
@@ -116,16 +176,46 @@ def _best_vocab_match(term: str, vocab: Set[str]) -> Tuple[str, float]:
     if norm_term in SPECIAL_COMBINATIONS and SPECIAL_COMBINATIONS[norm_term] in vocab:
         return SPECIAL_COMBINATIONS[norm_term], 1.0
     
-    best_score = 0.0
-    best_match = ""
+    # Same exact-hit shortcut and native scan as the batch version
+    return _best_vocab_matches([norm_term], vocab, score_cutoff)[0]
+
+
+def _best_vocab_matches(terms: List[str], vocab: Set[str], score_cutoff: float = 0.0) -> List[Tuple[str, float]]:
+    """
+    Batch version of _best_vocab_match for already-normalized terms.
+    
+    Args:
+        terms: Normalized terms to match
+        vocab: Set of vocabulary terms to match against
+        score_cutoff: Scores below this count as no match, letting the scorer exit early
+        
+    Returns:
+        List of (best matching vocabulary term, Jaro-Winkler score) per term
+    """
+    if not terms or not vocab:
+        return [("", 0.0)] * len(terms)
     
-    for vocab_term in vocab:
-        score = textdistance.jaro_winkler(norm_term, vocab_term)
-        if score > best_score:
-            best_score = score
-            best_match = vocab_term
-            
-    return best_match, best_score
+    # Exact hits score 1.0 without a scan; only the rest go to cdist
+    results = [(term, 1.0) if term in vocab else None for term in terms]
+    pending = [k for k, result in enumerate(results) if result is None]
+    if pending:
+        # Score the remaining terms against the whole vocabulary in one native call;
+        # argmax keeps the first best-scoring term on ties. RapidFuzz's early exit can drop a
+        # score sitting exactly on the cutoff to rounding, so it gets a little slack and the
+        # exact cutoff is applied here
+        vocab_list = list(vocab)
+        scores = process.cdist(
+            [terms[k] for k in pending], vocab_list, scorer=JaroWinkler.normalized_similarity,
+            score_cutoff=max(score_cutoff - 1e-6, 0.0), dtype=np.float64
+        )
+        best_idx = scores.argmax(axis=1)
+        best_scores = scores[np.arange(len(pending)), best_idx]
+        for k, idx, score in zip(pending, best_idx, best_scores):
+            if score > 0.0 and score >= score_cutoff:
+                results[k] = (vocab_list[idx], float(score))
+            else:
+                results[k] = ("", 0.0)
+    return results
 
 
 def _handle_and_splits(parts: List[str], vocab: Set[str]) -> List[str]:
@@ -151,19 +241,19 @@ def _handle_and_splits(parts: List[str], vocab: Set[str]) -> List[str]:
         # Check if this part contains ' and ' that wasn't already split
         if ' and ' in part.lower():
             # First check if the whole string closely matches a vocabulary term
-            whole_term_match, whole_term_score = _best_vocab_match(part, vocab)
+            whole_term_match, whole_term_score = _best_vocab_match(part, vocab, VOCAB_MATCH_THRESHOLD)
             if whole_term_score >= VOCAB_MATCH_THRESHOLD:
                 # The whole term is a known API, keep it intact
                 result.append(part)
                 continue
                 
             # Try splitting on 'and'
-            potential_split = re.split(r'\s+and\s+', part, flags=re.IGNORECASE)
+            potential_split = AND_ANY_CASE_PAT.split(part)
             
             if len(potential_split) == 2:  # Simple "X and Y" case
                 left, right = potential_split
-                left_match, left_score = _best_vocab_match(left, vocab)
-                right_match, right_score = _best_vocab_match(right, vocab)
+                left_match, left_score = _best_vocab_match(left, vocab, VOCAB_MATCH_THRESHOLD)
+                right_match, right_score = _best_vocab_match(right, vocab, VOCAB_MATCH_THRESHOLD)
                 
                 # Only split if both sides match vocabulary terms well
                 if left_score >= VOCAB_MATCH_THRESHOLD and right_score >= VOCAB_MATCH_THRESHOLD:
@@ -178,10 +268,19 @@ def _handle_and_splits(parts: List[str], vocab: Set[str]) -> List[str]:
     return result
 
 
+def clear_split_cache() -> None:
+    """Forget memoized split_apis results, e.g. after a vocabulary is modified in place."""
+    _SPLIT_CACHE.clear()
+    _MAX_TERM_WORDS.clear()
+
+
 def split_apis(drug_name: str, vocab: Set[str]) -> List[str]:
     """
     Split a potentially combination drug name into individual API components.
     
+    Results are memoized per drug name and vocabulary object; call clear_split_cache()
+    if the vocabulary is modified in place.
+    
     Args:
         drug_name: Raw drug name, possibly containing multiple APIs
         vocab: Set of normalized drug names to validate against
@@ -189,6 +288,16 @@ def split_apis(drug_name: str, vocab: Set[str]) -> List[str]:
     Returns:
         List of individual API components
     """
+    key = (drug_name, id(vocab))
+    entry = _SPLIT_CACHE.get(key)
+    if entry is None:
+        entry = (vocab, tuple(_split_apis(drug_name, vocab)))
+        _SPLIT_CACHE[key] = entry
+    return list(entry[1])
+
+
+def _split_apis(drug_name: str, vocab: Set[str]) -> List[str]:
+    """Uncached implementation of split_apis."""
     if not drug_name or not vocab:
         return []
     
@@ -199,38 +308,29 @@ def split_apis(drug_name: str, vocab: Set[str]) -> List[str]:
         return [canonical]
     
     # Quick exit for simple drug names without delimiters or parentheses
-    if '(' not in drug_name and ',' not in drug_name and '/' not in drug_name and '+' not in drug_name and '&' not in drug_name and ' and ' not in drug_name.lower() and ' with ' not in drug_name.lower():
+    lower_name = drug_name.lower()
+    if COMBINATION_CHARS.isdisjoint(drug_name) and ' and ' not in lower_name and ' with ' not in lower_name:
         # No indication of combination, return as single component
         return [drug_name.title()]
     
     # Special case for nested parentheses like "ABC/3TC (Abacavir/Lamivudine)"
     # Look for drug names directly in the string
-    components = []
-    for vocab_term in vocab:
-        if len(vocab_term) > 4:  # Skip very short terms to avoid false matches
-            # Create a pattern that matches the vocab term with word boundaries
-            pattern = r'\b' + re.escape(vocab_term) + r'\b'
-            if re.search(pattern, norm_drug, re.IGNORECASE):
-                components.append(vocab_term.title())
+    # (very short terms are skipped to avoid false matches)
+    components = _embedded_vocab_terms(norm_drug, vocab)
     
     # If we found likely drug names embedded in the string, return them
     if len(components) >= 2:
-        # Remove duplicates
-        unique_components = []
-        for comp in components:
-            if comp not in unique_components:
-                unique_components.append(comp)
-        return unique_components
+        # Already free of duplicates
+        return components
     
     # Pre-process complex combinations by looking for known special combinations
     # within the larger string
-    for pattern, replacement in SPECIAL_COMBINATIONS.items():
-        # Check if the pattern is in the drug name
-        pattern_regex = r'\b' + re.escape(pattern) + r'\b'
-        if re.search(pattern_regex, norm_drug, re.IGNORECASE):
-            # Replace the special pattern with a placeholder
-            norm_drug = re.sub(pattern_regex, "___PLACEHOLDER___", norm_drug, flags=re.IGNORECASE)
-            drug_name = re.sub(pattern_regex, "___PLACEHOLDER___", drug_name, flags=re.IGNORECASE)
+    found = {m.group(0).lower() for m in SPECIAL_PAT.finditer(norm_drug)}
+    if found:
+        # Replace the special patterns found with a placeholder in a single pass
+        drug_name = SPECIAL_PAT.sub(
+            lambda m: "___PLACEHOLDER___" if m.group(0).lower() in found else m.group(0), drug_name
+        )
     
     # Step A: Extract parenthetical content
     backbone, parentheticals = _extract_parentheticals(drug_name)
@@ -241,15 +341,15 @@ def split_apis(drug_name: str, vocab: Set[str]) -> List[str]:
     # Step B: Split backbone on unambiguous delimiters
     if backbone:
         backbone_parts = _split_by_delimiters(backbone)
-        # Replace placeholders with the original special combination
+        # Replace placeholders with the first special combination whose canonical name is
+        # in the vocabulary (they are dropped if there is none)
+        special = next((pattern for pattern, replacement in SPECIAL_COMBINATIONS.items()
+                        if replacement in vocab), None)
         processed_parts = []
         for part in backbone_parts:
             if "___PLACEHOLDER___" in part:
-                # Find the matching special combination
-                for pattern, replacement in SPECIAL_COMBINATIONS.items():
-                    if replacement in vocab:
-                        processed_parts.append(pattern)
-                        break
+                if special is not None:
+                    processed_parts.append(special)
             else:
                 processed_parts.append(part)
         components.extend(processed_parts)
@@ -261,7 +361,7 @@ def split_apis(drug_name: str, vocab: Set[str]) -> List[str]:
         if (len(p) <= 3) or (p.isupper() and len(p) <= 5) or any(c.isdigit() for c in p):
             continue
             
-        _, score = _best_vocab_match(p, vocab)
+        _, score = _best_vocab_match(p, vocab, VOCAB_MATCH_THRESHOLD)
         if score >= VOCAB_MATCH_THRESHOLD:
             # This parenthetical content looks like an API, keep it
             components.append(p)
@@ -272,13 +372,7 @@ def split_apis(drug_name: str, vocab: Set[str]) -> List[str]:
                 components.extend(p_parts)
             else:
                 # Check if there are drug names directly in the parenthetical
-                norm_p = normalize(p)
-                p_components = []
-                for vocab_term in vocab:
-                    if len(vocab_term) > 4:
-                        pattern = r'\b' + re.escape(vocab_term) + r'\b'
-                        if re.search(pattern, norm_p, re.IGNORECASE):
-                            p_components.append(vocab_term.title())
+                p_components = _embedded_vocab_terms(normalize(p), vocab)
                 if p_components:
                     components.extend(p_components)
     
@@ -286,20 +380,24 @@ def split_apis(drug_name: str, vocab: Set[str]) -> List[str]:
     components = _handle_and_splits(components, vocab)
     
     # Step D: Normalize each component
+    norms = [normalize(comp) for comp in components]
+    is_special = [norm in SPECIAL_COMBINATIONS and SPECIAL_COMBINATIONS[norm] in vocab for norm in norms]
+    # Match every remaining component against the vocabulary in one batch; only scores
+    # that pass the final filter matter
+    to_match = [norm for norm, special in zip(norms, is_special) if norm and not special]
+    vocab_matches = iter(_best_vocab_matches(to_match, vocab, FINAL_FILTER_THRESHOLD))
+    
     normalized_components = []
-    for comp in components:
-        # First normalize to lowercase for matching
-        norm = normalize(comp)
-        
+    for comp, norm, special in zip(components, norms, is_special):
         # Check for special combinations
-        if norm in SPECIAL_COMBINATIONS and SPECIAL_COMBINATIONS[norm] in vocab:
+        if special:
             canonical = SPECIAL_COMBINATIONS[norm].title()
             normalized_components.append(canonical)
             continue
         
         # Then get the best title-cased version from vocabulary or use title-cased original
         if norm:
-            best_match, score = _best_vocab_match(norm, vocab)
+            best_match, score = next(vocab_matches)
             # Step E: Filter out components that don't match vocabulary well
             if score >= FINAL_FILTER_THRESHOLD:
                 # Use either the matched vocab term or a title-cased version of the original
@@ -309,9 +407,4 @@ def split_apis(drug_name: str, vocab: Set[str]) -> List[str]:
                     normalized_components.append(comp.title())
     
     # Remove duplicates while preserving order
-    unique_components = []
-    for comp in normalized_components:
-        if comp not in unique_components:
-            unique_components.append(comp)
-    
-    return unique_components 
\ No newline at end of file
+    return list(dict.fromkeys(normalized_components)) 
\ No newline at end of file
@@ -5,14 +5,18 @@ Utilities for managing API vocabularies to support combination drug canonicaliza
 import json
 import logging
 import pandas as pd
+import pyarrow as pa
 from pathlib import Path
 from typing import Set, List, Tuple
 import pickle
 
 from ..config import PROC, FDA_CLEAN
 
-# Path for storing the vocabulary
-FDA_VOCAB_PATH = PROC / "fda_api_vocab.pkl"
+# Path for storing the vocabulary (an Arrow IPC file of sorted terms; older runs wrote a pickled set)
+FDA_VOCAB_PATH = PROC / "fda_api_vocab.arrow"
+ARROW_MAGIC = b"ARROW1"
+# Extracted vocabularies keyed by (FDA dataset path, modification time)
+_VOCAB_CACHE = {}
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s: %(message)s")
@@ -21,23 +25,28 @@ logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s: %(mes
 def extract_fda_vocabulary() -> Set[str]:
     """
     Extract a vocabulary of normalized drug names from the cleaned FDA dataset.
+    The result is cached until the dataset file changes; see clear_vocabulary_cache().
     
     Returns:
         Set[str]: Set of normalized drug names that can be used as a reference vocabulary
     """
     try:
+        key = (str(FDA_CLEAN), FDA_CLEAN.stat().st_mtime_ns) if FDA_CLEAN.exists() else None
+        if key in _VOCAB_CACHE:
+            return set(_VOCAB_CACHE[key])
         logging.info(f"Loading FDA dataset from {FDA_CLEAN}")
         fda_df = pd.read_parquet(FDA_CLEAN)
         
-        # Ensure drug_norm column exists
-        if "drug_norm" not in fda_df.columns:
+        # Use drug_norm if present, else normalize each distinct name once
+        if "drug_norm" in fda_df.columns:
+            vocab = set(pd.unique(fda_df["drug_norm"].dropna()))
+        else:
             from ..utils.text import normalize
-            logging.info("Creating drug_norm column")
-            fda_df["drug_norm"] = fda_df["Drug Name"].apply(normalize)
-        
-        # Extract unique normalized drug names
-        vocab = set(fda_df["drug_norm"].dropna().unique())
+            logging.info("Normalizing unique drug names")
+            vocab = set(map(normalize, pd.unique(fda_df["Drug Name"])))
         logging.info(f"Extracted {len(vocab)} unique API terms from FDA dataset")
+        if key is not None:
+            _VOCAB_CACHE[key] = frozenset(vocab)
         return vocab
         
     except Exception as e:
@@ -45,6 +54,11 @@ def extract_fda_vocabulary() -> Set[str]:
         return set()
 
 
+def clear_vocabulary_cache() -> None:
+    """Forget extracted vocabularies, e.g. when the FDA dataset is replaced within one mtime tick."""
+    _VOCAB_CACHE.clear()
+
+
 def save_vocabulary(vocab: Set[str], path: Path = FDA_VOCAB_PATH) -> bool:
     """
     Save the vocabulary to disk for later use.
@@ -58,8 +72,10 @@ def save_vocabulary(vocab: Set[str], path: Path = FDA_VOCAB_PATH) -> bool:
     """
     try:
         path.parent.mkdir(exist_ok=True, parents=True)
-        with open(path, 'wb') as f:
-            pickle.dump(vocab, f)
+        # One Arrow string column, read back in C without unpickling
+        table = pa.table({"term": pa.array(sorted(vocab), type=pa.string())})
+        with pa.OSFile(str(path), 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
         logging.info(f"Saved {len(vocab)} API terms to {path}")
         return True
     except Exception as e:
@@ -69,7 +85,7 @@ def save_vocabulary(vocab: Set[str], path: Path = FDA_VOCAB_PATH) -> bool:
 
 def load_vocabulary(path: Path = FDA_VOCAB_PATH) -> Set[str]:
     """
-    Load the vocabulary from disk.
+    Load the vocabulary from disk, falling back to a legacy pickle next to the path.
     
     Args:
         path: Path to the saved vocabulary
@@ -78,12 +94,20 @@ def load_vocabulary(path: Path = FDA_VOCAB_PATH) -> Set[str]:
         Set[str]: The loaded vocabulary or empty set if file not found
     """
     try:
+        if not path.exists() and path.with_suffix(".pkl").exists():
+            path = path.with_suffix(".pkl")  # Vocabulary saved by an older version
         if not path.exists():
             logging.warning(f"Vocabulary file {path} not found")
             return set()
             
         with open(path, 'rb') as f:
-            vocab = pickle.load(f)
+            is_arrow = f.read(len(ARROW_MAGIC)) == ARROW_MAGIC
+        if is_arrow:
+            with pa.memory_map(str(path)) as source:
+                vocab = set(pa.ipc.open_file(source).read_all().column("term").to_pylist())
+        else:
+            with open(path, 'rb') as f:
+                vocab = pickle.load(f)
         logging.info(f"Loaded {len(vocab)} API terms from {path}")
         return vocab
     except Exception as e:
@@ -1,24 +1,50 @@
 """
 Utilities for resolving drug names to RxNorm IDs using NLM RxNav API, with local caching.
 """
+import atexit
 import json
 import logging
+import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import requests
+from requests.adapters import HTTPAdapter
 from ..config import PROC
 
+try:
+    import orjson  # Faster cache (de)serialization when available
+except ImportError:
+    orjson = None
+
 # Path for caching name->RxCUI mappings
 tRXCUI_CACHE = PROC / "rxnorm_cache.json"
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s: %(message)s")
 
+# In-memory cache, loaded on first lookup and written back only when it changed
+_CACHE: dict | None = None
+_DIRTY = False
+
+# NLM allows up to 20 requests per second to RxNav
+RATE_LIMIT = 20
+MAX_WORKERS = 20
+
+# Reuse keep-alive connections to RxNav across lookups, one per worker
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_maxsize=MAX_WORKERS))
+
+_RATE_LOCK = threading.Lock()
+_NEXT_SLOT = 0.0
+
 
 def _load_cache():
     if not tRXCUI_CACHE.exists():
         return {}
     try:
-        return json.loads(tRXCUI_CACHE.read_text(encoding='utf-8'))
+        data = tRXCUI_CACHE.read_bytes()
+        return orjson.loads(data) if orjson else json.loads(data)
     except Exception as e:
         logging.error(f"Failed to load RxNorm cache: {e}")
         return {}
@@ -27,29 +53,52 @@ def _load_cache():
 def _save_cache(cache: dict):
     try:
         tRXCUI_CACHE.parent.mkdir(exist_ok=True, parents=True)
-        tRXCUI_CACHE.write_text(json.dumps(cache, indent=2), encoding='utf-8')
+        # Write to a temporary file and swap it in so a crash never leaves a truncated cache
+        tmp_path = tRXCUI_CACHE.with_suffix(".json.tmp")
+        if orjson:
+            tmp_path.write_bytes(orjson.dumps(cache, option=orjson.OPT_INDENT_2))
+        else:
+            tmp_path.write_text(json.dumps(cache, indent=2), encoding='utf-8')
+        os.replace(tmp_path, tRXCUI_CACHE)
     except Exception as e:
         logging.error(f"Failed to save RxNorm cache: {e}")
 
 
-def name_to_rxcui(name: str) -> str | None:
-    """
-    Resolve a drug name to a single RxCUI ID via the NLM RxNav API, with caching.
+def _get_cache() -> dict:
+    global _CACHE
+    if _CACHE is None:
+        _CACHE = _load_cache()
+    return _CACHE
 
-    Args:
-        name: Drug name string (normalized)
 
-    Returns:
-        str or None: RxCUI identifier if found, else None
-    """
-    cache = _load_cache()
-    if name in cache:
-        return cache[name]
+def flush_rxcui_cache():
+    """Write new RxNorm lookups to the cache file, if there are any."""
+    global _DIRTY
+    if _DIRTY and _CACHE is not None:
+        _save_cache(_CACHE)
+        _DIRTY = False
+
+
+atexit.register(flush_rxcui_cache)
 
+
+def _throttle():
+    """Block until the next request slot under RATE_LIMIT is free."""
+    global _NEXT_SLOT
+    with _RATE_LOCK:
+        now = time.monotonic()
+        wait = _NEXT_SLOT - now
+        _NEXT_SLOT = max(now, _NEXT_SLOT) + 1.0 / RATE_LIMIT
+    if wait > 0:
+        time.sleep(wait)
+
+
+def _fetch_rxcui(name: str) -> str | None:
     rxcui = None
+    _throttle()
     try:
         url = f"https://rxnav.nlm.nih.gov/REST/rxcui.json?name={requests.utils.quote(name)}"
-        resp = requests.get(url, timeout=5)
+        resp = _SESSION.get(url, timeout=5)
         data = resp.json()
         ids = data.get('idGroup', {}).get('rxnormId', [])
         if ids:
@@ -57,8 +106,39 @@ def name_to_rxcui(name: str) -> str | None:
             logging.info(f"Mapped '{name}' to RxCUI {rxcui}")
     except Exception as e:
         logging.error(f"RxNorm lookup error for '{name}': {e}")
-    cache[name] = rxcui
-    _save_cache(cache)
-    # Rate limiting
-    time.sleep(0.1)
-    return rxcui 
\ No newline at end of file
+    return rxcui
+
+
+def names_to_rxcuis(names) -> dict:
+    """
+    Resolve many drug names to RxCUI IDs, querying uncached names concurrently.
+
+    Args:
+        names: Iterable of drug name strings (normalized)
+
+    Returns:
+        dict: Mapping of each name to its RxCUI identifier, or None if not found
+    """
+    global _DIRTY
+    cache = _get_cache()
+    names = list(dict.fromkeys(names))
+    missing = [n for n in names if n not in cache]
+    if missing:
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(missing))) as pool:
+            for name, rxcui in zip(missing, pool.map(_fetch_rxcui, missing)):
+                cache[name] = rxcui
+        _DIRTY = True
+    return {n: cache[n] for n in names}
+
+
+def name_to_rxcui(name: str) -> str | None:
+    """
+    Resolve a drug name to a single RxCUI ID via the NLM RxNav API, with caching.
+
+    Args:
+        name: Drug name string (normalized)
+
+    Returns:
+        str or None: RxCUI identifier if found, else None
+    """
+    return names_to_rxcuis([name])[name]
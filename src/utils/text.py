@@ -1,15 +1,31 @@
 # Reduce to essential text normalization utilities
 import re, unicodedata
+from functools import lru_cache
 
+NON_ALNUM_PAT = re.compile(r"[^a-z0-9 ]")
+WS_PAT = re.compile(r"\s+")
+# Byte table for the ASCII fast path: A-Z lowercased, a-z/0-9 kept, everything else a space
+_ASCII_TABLE = bytes(
+    c + 32 if 65 <= c <= 90 else c if 48 <= c <= 57 or 97 <= c <= 122 else 32
+    for c in range(256)
+)
 
+
+@lru_cache(maxsize=131072)  # drug names recur across datasets and splitter passes
 def normalize(txt: str) -> str:
     if txt is None:
         return ""
+    if txt.isascii():
+        # Lowercase and blank out punctuation in one table lookup, then collapse spaces
+        return " ".join(txt.encode("ascii").translate(_ASCII_TABLE).decode("ascii").split())
+    # NFKD leaves ASCII unchanged, so only decompose the rare non-ASCII name
     txt = unicodedata.normalize("NFKD", txt.lower())
-    txt = re.sub(r"[^a-z0-9 ]", " ", txt)
-    return re.sub(r"\s+", " ", txt).strip()
+    txt = NON_ALNUM_PAT.sub(" ", txt)
+    return WS_PAT.sub(" ", txt).strip()
 
 
 def jaccard(a: str, b: str) -> float:
-    sa, sb = map(set, map(str.split, (normalize(a), normalize(b))))
-    return len(sa & sb) / len(sa | sb | {" "})
+    sa, sb = set(normalize(a).split()), set(normalize(b).split())
+    inter = len(sa & sb)
+    # Union size by inclusion-exclusion, padded by one so two empty names give 0.0
+    return inter / (len(sa) + len(sb) - inter + 1)
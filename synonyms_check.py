@@ -14,23 +14,18 @@ with open('data/processed/synonyms.json', 'r') as f:
 # Load raw unmatched names
 with open('data/processed/unmatched_cdsco.txt', 'r') as f:
     raw_names = [line.strip() for line in f if line.strip()]
-# Build reverse map: norm -> list of raw names
-rev_map = {}
-for raw in raw_names:
-    norm = normalize(raw)
-    rev_map.setdefault(norm, []).append(raw)
+# Pair each synonym with the raw names that normalize to it; an inner merge keeps the
+# synonyms' order, and the raw names' order within each synonym
+raw_df = pd.DataFrame({'raw': raw_names})
+raw_df['norm'] = raw_df['raw'].map(normalize)
+syn_df = pd.DataFrame(list(synonyms.items()), columns=['norm', 'canonical'])
+merged = syn_df.merge(raw_df, on='norm')
 # Load overlap results
-ov = pd.read_csv('data/processed/overlap.csv')
-matched = set(ov['CDSCO Drug Name'].unique())
+ov = pd.read_csv('data/processed/overlap.csv', usecols=['CDSCO Drug Name'])
 # Check mapping results
-matched_raw = []
-unmatched_raw = []
-for norm, canonical in synonyms.items():
-    for raw in rev_map.get(norm, []):
-        if raw in matched:
-            matched_raw.append(raw)
-        else:
-            unmatched_raw.append(raw)
+is_matched = merged['raw'].isin(ov['CDSCO Drug Name'])
+matched_raw = merged.loc[is_matched, 'raw'].tolist()
+unmatched_raw = merged.loc[~is_matched, 'raw'].tolist()
 # Summarize
 print(f"Total synonyms entries: {len(synonyms)}")
 print(f"Raw names matched after synonyms: {len(matched_raw)}")
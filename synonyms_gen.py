@@ -4,9 +4,10 @@ synonyms_gen.py
 
 Script to generate a synonyms.json file by fuzzy-matching unmatched CDSCO drug names to FDA canonical names.
 """
+import numpy as np
 import pandas as pd
 import json
-from rapidfuzz import fuzz
+from rapidfuzz import fuzz, process
 from src.utils.text import normalize
 
 # Load FDA cleaned dataset
@@ -18,20 +19,19 @@ fda_norms = list({normalize(n) for n in fda['Drug Name'].dropna()})
 with open('data/processed/unmatched_cdsco.txt', 'r', encoding='utf-8') as f:
     unmatched = [line.strip() for line in f if line.strip()]
 
-# Generate synonym mappings
+# Score every unmatched name against every FDA name in one call (scores under the cutoff become 0)
+norm_names = [normalize(name) for name in unmatched]
+scores = process.cdist(norm_names, fda_norms, scorer=fuzz.token_set_ratio,
+                       score_cutoff=85, dtype=np.float64, workers=-1)
+
+# Best FDA name per CDSCO name, keeping only confident mappings
 synonyms = {}
-for name in unmatched:
-    norm_name = normalize(name)
-    best_score = 0
-    best_match = None
-    for fda_norm in fda_norms:
-        score = fuzz.token_set_ratio(norm_name, fda_norm)
-        if score > best_score:
-            best_score = score
-            best_match = fda_norm
-    # Only keep confident mappings
-    if best_score >= 85:
-        synonyms[norm_name] = best_match
+if fda_norms:
+    best_idx = scores.argmax(axis=1)
+    best_score = scores[np.arange(len(norm_names)), best_idx]
+    for norm_name, idx, score in zip(norm_names, best_idx, best_score):
+        if score >= 85:
+            synonyms[norm_name] = fda_norms[idx]
 
 # Write to synonyms.json
 with open('data/processed/synonyms.json', 'w', encoding='utf-8') as out:
@@ -6,7 +6,10 @@ from src.utils.api_splitter import (
     _extract_parentheticals,
     _split_by_delimiters,
     _best_vocab_match,
+    _best_vocab_matches,
+    _embedded_vocab_terms,
     _handle_and_splits,
+    clear_split_cache,
     split_apis
 )
 
@@ -86,6 +89,25 @@ def test_split_by_delimiters():
     # Empty input
     parts = _split_by_delimiters("")
     assert parts == []
+    
+    # Words are case-sensitive and never take a delimiter's whitespace
+    assert _split_by_delimiters("Metformin AND Glibenclamide") == ["Metformin AND Glibenclamide"]
+    assert _split_by_delimiters("A with + B") == ["A with", "B"]
+    assert _split_by_delimiters("A with and B") == ["A with", "B"]
+
+
+def test_embedded_vocab_terms(mock_vocab):
+    """Test finding whole-word vocabulary terms inside normalized text."""
+    # Terms are returned in text order, once each
+    terms = _embedded_vocab_terms("abc 3tc abacavir lamivudine abacavir", mock_vocab)
+    assert terms == ["Abacavir", "Lamivudine"]
+    
+    # Multi-word terms and their sub-terms are both found
+    terms = _embedded_vocab_terms("leucovorin calcium folinate", mock_vocab)
+    assert terms == ["Calcium", "Calcium Folinate"]
+    
+    # Partial words do not count
+    assert _embedded_vocab_terms("aspirins", mock_vocab) == []
 
 
 def test_best_vocab_match(mock_vocab):
@@ -110,6 +132,21 @@ def test_best_vocab_match(mock_vocab):
     assert score < 0.8
 
 
+def test_best_vocab_matches_agrees_with_single(mock_vocab):
+    """Test batch vocabulary matching against the single-term version."""
+    terms = ["aspirin", "asppirin", "xyz123", "clavulanic acid"]
+    assert _best_vocab_matches(terms, mock_vocab) == [_best_vocab_match(t, mock_vocab) for t in terms]
+    assert _best_vocab_matches([], mock_vocab) == []
+
+
+def test_best_vocab_matches_score_cutoff():
+    """Test that a score exactly on the cutoff passes and lower scores count as no match."""
+    # Jaro-Winkler("ramipril", "rifampin") is exactly 0.8
+    assert _best_vocab_matches(["ramipril"], {"rifampin"}, 0.8) == [("rifampin", 0.8)]
+    assert _best_vocab_matches(["ramipril"], {"rifampin"}, 0.9) == [("", 0.0)]
+    assert _best_vocab_match("Ramipril", {"rifampin"}, 0.9) == ("", 0.0)
+
+
 def test_handle_and_splits(mock_vocab):
     """Test handling 'and' splits."""
     # Should split - both sides match vocabulary
@@ -205,4 +242,21 @@ def test_split_apis_complex_cases(mock_vocab):
     
     # Nested parentheses
     apis = split_apis("Antiretroviral (ABC/3TC (Abacavir/Lamivudine))", mock_vocab)
-    assert sorted(apis) == sorted(["Abacavir", "Lamivudine"]) 
\ No newline at end of file
+    assert sorted(apis) == sorted(["Abacavir", "Lamivudine"]) 
+
+
+def test_split_apis_memoized(mock_vocab):
+    """Test that split_apis results are cached per vocabulary and can be cleared."""
+    clear_split_cache()
+    apis = split_apis("Aspirin + Paracetamol", mock_vocab)
+    apis.append("Mutated")
+    # Callers get a fresh list, so mutating one result does not leak into the cache
+    assert split_apis("Aspirin + Paracetamol", mock_vocab) == ["Aspirin", "Paracetamol"]
+    
+    # A different vocabulary object is cached separately
+    assert split_apis("Aspirin + Paracetamol", {"aspirin"}) == ["Aspirin"]
+    
+    # Clearing forgets results for vocabularies modified in place
+    mock_vocab.discard("paracetamol")
+    clear_split_cache()
+    assert split_apis("Aspirin + Paracetamol", mock_vocab) == ["Aspirin"]
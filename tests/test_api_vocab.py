@@ -7,12 +7,21 @@ from src.utils.api_vocab import (
     extract_fda_vocabulary, 
     save_vocabulary, 
     load_vocabulary, 
-    build_and_save_vocabulary
+    build_and_save_vocabulary,
+    clear_vocabulary_cache,
 )
 from src.utils.text import normalize
 from src.config import PROC
 
 
+@pytest.fixture(autouse=True)
+def fresh_vocabulary_cache():
+    """Each test extracts from its own mocked dataset."""
+    clear_vocabulary_cache()
+    yield
+    clear_vocabulary_cache()
+
+
 @pytest.fixture
 def mock_fda_dataframe():
     """Create a mock FDA dataframe for testing."""
@@ -61,6 +70,34 @@ def test_extract_vocabulary(monkeypatch, mock_fda_dataframe):
     assert "diclofenac sodium" in vocab
 
 
+def test_extract_vocabulary_normalizes_missing_column(monkeypatch, mock_fda_dataframe):
+    """Without a drug_norm column, each distinct drug name is normalized once."""
+    df = pd.concat([mock_fda_dataframe, mock_fda_dataframe]).drop(columns=["drug_norm"])
+    monkeypatch.setattr(pd, "read_parquet", lambda *args, **kwargs: df)
+
+    vocab = extract_fda_vocabulary()
+
+    assert vocab == set(mock_fda_dataframe["drug_norm"])
+
+
+def test_extract_vocabulary_cached_until_file_changes(monkeypatch, tmp_path, mock_fda_dataframe):
+    """The FDA dataset is read once per file version."""
+    import src.utils.api_vocab as api_vocab
+    fda_path = tmp_path / "fda_clean.parquet"
+    fda_path.touch()
+    monkeypatch.setattr(api_vocab, "FDA_CLEAN", fda_path)
+    reads = []
+    monkeypatch.setattr(pd, "read_parquet", lambda *args, **kwargs: reads.append(args) or mock_fda_dataframe)
+
+    assert extract_fda_vocabulary() == extract_fda_vocabulary()
+    assert len(reads) == 1
+
+    stat = fda_path.stat()
+    os.utime(fda_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    extract_fda_vocabulary()
+    assert len(reads) == 2
+
+
 def test_save_and_load_vocabulary(temp_vocab_path):
     """Test saving and loading a vocabulary."""
     test_vocab = {"drug1", "drug2", "drug3"}
@@ -83,4 +120,18 @@ def test_load_nonexistent_vocabulary(temp_vocab_path):
     
     # Try to load a non-existent vocabulary
     vocab = load_vocabulary(temp_vocab_path)
-    assert vocab == set() 
\ No newline at end of file
+    assert vocab == set() 
+
+def test_save_vocabulary_writes_sorted_array(temp_vocab_path):
+    """Test that the vocabulary is stored as a sorted array without pickling."""
+    import pyarrow as pa
+    save_vocabulary({"zidovudine", "abacavir"}, temp_vocab_path)
+    table = pa.ipc.open_file(str(temp_vocab_path)).read_all()
+    assert table.column("term").to_pylist() == ["abacavir", "zidovudine"]
+
+
+def test_load_legacy_pickled_vocabulary(tmp_path):
+    """Test that a pickled set saved next to the requested path still loads."""
+    with open(tmp_path / "vocab.pkl", "wb") as f:
+        pickle.dump({"drug1", "drug2"}, f)
+    assert load_vocabulary(tmp_path / "vocab.arrow") == {"drug1", "drug2"}
@@ -1,7 +1,8 @@
 # Create a new test file for cleaning functions
 import pytest
 import pandas as pd
-from src.data.clean import _norm_date, _norm_text, _strip_forms
+import src.data.clean as clean_mod
+from src.data.clean import _norm_date, _norm_dates, _norm_text, _norm_texts, _strip_forms, _strip_all_forms
 
 
 def test_norm_date():
@@ -11,6 +12,12 @@ def test_norm_date():
     assert _norm_date(None) is pd.NaT
 
 
+def test_norm_dates_matches_norm_date():
+    dates = pd.Series(["2023", "12/2023", "01-02-23", "1.2.99", "3/4/2001", "n/a", "", None])
+    expected = [_norm_date(d) for d in dates]
+    assert _norm_dates(dates).tolist() == expected
+
+
 def test_norm_text():
     assert _norm_text("  Hello   World  ") == "Hello World"
     assert _norm_text(None) == ""
@@ -19,4 +26,23 @@ def test_norm_text():
 def test_strip_forms():
     assert _strip_forms("Paracetamol 500mg Tablet") == "Paracetamol"
     assert _strip_forms("Aspirin 100mg") == "Aspirin"
-    assert _strip_forms("Cough Syrup") == "Cough Syrup" 
\ No newline at end of file
+    assert _strip_forms("Cough Syrup") == "Cough Syrup" 
+    assert _strip_forms("Tobramycin 0.3% Eye Drops") == "Tobramycin"
+    assert _strip_forms("Betamethasone 0.1%w/w") == "Betamethasone 0.1"
+
+
+def test_vectorized_text_helpers_match_scalar():
+    drugs = pd.Series(["Paracetamol 500mg Tablet", "  Aspirin   100mg", "Cough Syrup", None])
+    assert _strip_all_forms(drugs).tolist() == [_strip_forms(d) for d in drugs]
+    assert _norm_texts(drugs).tolist() == [_norm_text(d) for d in drugs]
+
+
+def test_explode_combination_drugs(monkeypatch):
+    monkeypatch.setattr(clean_mod, "load_vocabulary", lambda path: {"abacavir", "lamivudine"})
+    df = pd.DataFrame({"Drug Name": ["Abacavir + Lamivudine", "Lamivudine", ""], "Sr.No": [1, 2, 3]})
+    exploded = clean_mod._explode_combination_drugs(df)
+    assert sorted(exploded["Drug Name"][:2]) == ["Abacavir", "Lamivudine"]
+    assert exploded["Drug Name"].tolist()[2:] == ["Lamivudine", ""]
+    assert exploded["Sr.No"].tolist() == [1, 1, 2, 3]
+    assert exploded["Is Combination"].tolist() == [True, True, False, None]
+    assert exploded["Original Drug Name"].isna().tolist() == [False, False, False, True]
@@ -1,6 +1,11 @@
 # Create a new test file for compare functions
+import numpy as np
+import pandas as pd
 import pytest
-from src.analysis.compare import jaro
+from rapidfuzz import fuzz
+import src.analysis.compare as compare_mod
+from src.analysis.compare import jaro, run, sweep, _jaccard_matrix, _score_candidates, _token_fingerprint, _write_matches
+from src.utils.text import jaccard
 
 
 def test_jaro():
@@ -9,4 +14,61 @@ def test_jaro():
     assert jaro("hello", "world") < 0.5
     assert jaro("", "") == 1.0
     assert jaro("a", "") == 0.0
-    assert jaro("", "a") == 0.0 
\ No newline at end of file
+    assert jaro("", "a") == 0.0
+    # Symmetric, so swapped arguments hit the same cache entry
+    assert jaro("martha", "marhta") == jaro("marhta", "martha")
+    assert jaro(None, "a") == 0.0
+
+
+def test_jaccard_matrix_matches_pairwise_jaccard():
+    queries = ["abacavir lamivudine", "calcium folinate", "aspirin", ""]
+    choices = ["abacavir", "lamivudine zidovudine", "calcium", "folinic acid calcium", "ibuprofen"]
+    scores = _jaccard_matrix(queries, choices)
+    assert scores.tolist() == [[jaccard(q, c) for c in choices] for q in queries]
+
+
+def test_token_fingerprint_preserves_token_set_ratio():
+    pairs = [
+        ("folinic acid calcium", "calcium folinate"),
+        ("abacavir abacavir lamivudine", "lamivudine  abacavir"),
+        ("aspirin", ""),
+    ]
+    for a, b in pairs:
+        assert fuzz.token_set_ratio(_token_fingerprint(a), _token_fingerprint(b)) == fuzz.token_set_ratio(a, b)
+
+
+def test_write_matches_orders_by_score_and_fills_match_type(tmp_path):
+    best = {
+        "Aspirin": {"CDSCO Drug Name": "Aspirin", "FDA Drug Name": "Aspirin", "Similarity Score": 0.9,
+                    "Token Score": 100.0, "CDSCO Indication": None},
+        "Mesna": {"CDSCO Drug Name": "Mesna", "FDA Drug Name": "Mesna", "Similarity Score": 1.0,
+                  "Match Type": "RxNorm"},
+    }
+    out_file = tmp_path / "overlap.csv"
+    assert _write_matches(best, out_file) == 2
+    df = pd.read_csv(out_file)
+    assert df["CDSCO Drug Name"].tolist() == ["Mesna", "Aspirin"]
+    assert df["Match Type"].tolist() == ["RxNorm", "Fuzzy"]
+    assert df["CDSCO Indication"].isna().all()
+
+
+def test_sweep_agrees_with_run(tmp_path):
+    # Each threshold pair of a sweep writes exactly what a separate run would
+    for jw, jacc, best in sweep([0.8, 0.9], [0.1, 0.3]):
+        returned = run(threshold=jw, jaccard_threshold=jacc, out_file=tmp_path / "run.csv")
+        _write_matches(best, tmp_path / "sweep.csv")
+        assert (tmp_path / "sweep.csv").read_text() == (tmp_path / "run.csv").read_text()
+        # run() also hands back the records it wrote, so callers need not re-read the CSV
+        assert returned.keys() == best.keys()
+
+
+def test_score_candidates_dense_and_sparse_agree(monkeypatch):
+    queries = ["abacavir lamivudine", "calcium folinate", "aspirin", "ibuprofen"]
+    choices = ["abacavir", "lamivudine zidovudine", "calcium", "folinic acid calcium", "ibuprofen"]
+    results = []
+    for fraction in (0.0, 1.1):  # Always whole-tile cdist, then always per-pair cpdist
+        monkeypatch.setattr(compare_mod, "DENSE_FRACTION", fraction)
+        results.append(_score_candidates(queries, choices, 0.0, 0.85, 85, 1))
+    dense, sparse = results
+    for key in dense:
+        np.testing.assert_array_equal(dense[key], sparse[key])
@@ -1,3 +1,4 @@
+import numpy as np
 import pytest
 
 from src.analysis.compare import is_high_confidence_match
@@ -25,4 +26,18 @@ def test_one_metric_above_threshold():
 def test_edge_threshold_values():
     # Metrics equal to thresholds count as exceeding
     assert is_high_confidence_match(0.85, 85, 84, 0.85, 85, 85)
-    assert is_high_confidence_match(0.84, 85, 85, 0.85, 85, 85) 
\ No newline at end of file
+    assert is_high_confidence_match(0.84, 85, 85, 0.85, 85, 85) 
+
+def test_array_scores_return_elementwise_mask():
+    # Score matrices from process.cdist are evaluated element-wise
+    jw = np.array([[0.9, 0.8], [0.9, 0.8]])
+    token = np.array([[90, 90], [80, 80]])
+    ratio = np.array([[80, 80], [90, 80]])
+    mask = is_high_confidence_match(jw, token, ratio, 0.85, 85, 85)
+    assert mask.tolist() == [[True, False], [True, False]]
+
+
+def test_numpy_scalar_scores():
+    # NumPy scalars compare to np.bool_, which must still be counted, not OR-ed
+    assert not is_high_confidence_match(np.float64(0.9), np.float64(80), np.float64(80), 0.85, 85, 85)
+    assert is_high_confidence_match(np.float64(0.9), np.float64(90), np.float64(80), 0.85, 85, 85)
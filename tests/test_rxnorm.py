@@ -0,0 +1,63 @@
+import json
+import pytest
+import src.utils.rxnorm as rxnorm
+
+
+class FakeResponse:
+    def __init__(self, ids):
+        self.ids = ids
+
+    def json(self):
+        return {"idGroup": {"rxnormId": self.ids}}
+
+
+class FakeSession:
+    """Stand-in for requests.Session that counts lookups."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def get(self, url, timeout):
+        self.calls += 1
+        return FakeResponse(["1202"] if "atenolol" in url else [])
+
+
+@pytest.fixture
+def fake_rxnav(tmp_path, monkeypatch):
+    """Point the RxNorm cache at a temp file and stub out the network."""
+    session = FakeSession()
+    monkeypatch.setattr(rxnorm, "tRXCUI_CACHE", tmp_path / "rxnorm_cache.json")
+    monkeypatch.setattr(rxnorm, "_CACHE", None)
+    monkeypatch.setattr(rxnorm, "_DIRTY", False)
+    monkeypatch.setattr(rxnorm, "_SESSION", session)
+    monkeypatch.setattr(rxnorm.time, "sleep", lambda s: None)
+    return session
+
+
+def test_name_to_rxcui_caches_in_memory(fake_rxnav):
+    assert rxnorm.name_to_rxcui("atenolol") == "1202"
+    assert rxnorm.name_to_rxcui("atenolol") == "1202"
+    assert rxnorm.name_to_rxcui("unknown drug") is None
+    assert fake_rxnav.calls == 2
+    # Nothing is written until the cache is flushed
+    assert not rxnorm.tRXCUI_CACHE.exists()
+
+
+def test_flush_rxcui_cache_writes_file(fake_rxnav):
+    rxnorm.name_to_rxcui("atenolol")
+    rxnorm.flush_rxcui_cache()
+    assert json.loads(rxnorm.tRXCUI_CACHE.read_text()) == {"atenolol": "1202"}
+
+
+def test_names_to_rxcuis_batches_uncached(fake_rxnav):
+    rxnorm.name_to_rxcui("atenolol")
+    result = rxnorm.names_to_rxcuis(["atenolol", "unknown drug", "unknown drug"])
+    assert result == {"atenolol": "1202", "unknown drug": None}
+    assert fake_rxnav.calls == 2
+
+
+def test_cache_round_trip_without_orjson(fake_rxnav, monkeypatch):
+    monkeypatch.setattr(rxnorm, "orjson", None)
+    rxnorm.name_to_rxcui("atenolol")
+    rxnorm.flush_rxcui_cache()
+    assert rxnorm._load_cache() == {"atenolol": "1202"}
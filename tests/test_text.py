@@ -8,6 +8,10 @@ def test_normalize():
     assert normalize("  Multiple   spaces ") == "multiple spaces"
     assert normalize(None) == ""
     assert normalize("") == ""
+    # Non-ASCII names are still decomposed before stripping accents
+    assert normalize("Café Ｎo.2") == "cafe no 2"
+    # Tabs, newlines and punctuation all collapse to single spaces
+    assert normalize("\tAmoxicillin+Clavulanate\n(500MG)") == "amoxicillin clavulanate 500mg"
 
 
 def test_jaccard():
@@ -6,8 +6,7 @@ Utility script to evaluate how many overlap matches we get under different Jaro-
 and Jaccard threshold settings. This helps pick thresholds that maximize coverage.
 """
 import pandas as pd
-from itertools import product
-from src.analysis.compare import run
+from src.analysis.compare import sweep, _write_matches
 
 # Define threshold ranges to sweep
 JW_VALUES = [0.70, 0.80, 0.85, 0.90, 0.95]
@@ -20,23 +19,21 @@ OUT_DIR = "data/processed"
 def sweep_thresholds(save_intermediate: bool = True):
     """
     Run the fuzzy matching pipeline across combinations of JW and Jaccard thresholds.
+    Candidate pairs are scored once and re-thresholded for each combination.
     Prints a summary table with total match counts and unique CDSCO matches.
     """
     results = []
-    for jw, jacc in product(JW_VALUES, JACCARD_VALUES):
-        out_file = f"{OUT_DIR}/overlap_jw{jw:.2f}_jac{jacc:.2f}.csv"
-        print(f"Running thresholds: Jaro-W={jw:.2f}, Jaccard={jacc:.2f}")
-        run(threshold=jw, jaccard_threshold=jacc, out_file=out_file)
-        df = pd.read_csv(out_file)
-        total_matches = len(df)
-        cdsco_unique = df["CDSCO Drug Name"].nunique()
-        fda_unique = df["FDA Drug Name"].nunique()
+    for jw, jacc, best in sweep(JW_VALUES, JACCARD_VALUES):
+        print(f"Thresholds: Jaro-W={jw:.2f}, Jaccard={jacc:.2f}")
+        if save_intermediate:
+            _write_matches(best, f"{OUT_DIR}/overlap_jw{jw:.2f}_jac{jacc:.2f}.csv")
+        records = best.values()
         results.append({
             "Jaro-Winkler": jw,
             "Jaccard": jacc,
-            "TotalMatches": total_matches,
-            "UniqueCDSCO": cdsco_unique,
-            "UniqueFDA": fda_unique,
+            "TotalMatches": len(best),
+            "UniqueCDSCO": len({r["CDSCO Drug Name"] for r in records}),
+            "UniqueFDA": len({r["FDA Drug Name"] for r in records}),
         })
     summary = pd.DataFrame(results)
     print("\nThreshold sweep summary:")